@@ -1,8 +1,108 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
 import os
+import sys
+
+import matplotlib
+# Headless runs (batch/CI) skip GUI toolkit initialization entirely; on
+# Windows/macOS the default backend needs no display variable
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _sampling_rate_stats(times):
+        """
+        Fused single-pass sampling-rate kernel.
+
+        Computes consecutive time differences, their reciprocals, and the
+        running mean/std/min/max in one sweep over the buffer instead of one
+        full memory pass per statistic. Returns the rates array as well so
+        the caller can take the median and plot the histogram.
+
+        Args:
+            times: float64 ndarray of timestamps in seconds
+
+        Returns:
+            (mean, std, min, max, rates)
+        """
+        n = times.shape[0] - 1
+        rates = np.empty(n, np.float64)
+        count = 0
+        total = 0.0
+        total_sq = 0.0
+        mn = np.inf
+        mx = -np.inf
+        for i in range(n):
+            dt = times[i + 1] - times[i]
+            # Negated comparison also skips NaN diffs, matching the
+            # time_diffs > 0 mask of the non-numba path
+            if not (dt > 0.0):
+                continue
+            r = 1.0 / dt
+            rates[count] = r
+            count += 1
+            total += r
+            total_sq += r * r
+            if r < mn:
+                mn = r
+            if r > mx:
+                mx = r
+        if count == 0:
+            # Single-row input or no strictly increasing timestamps: report
+            # NaN like pandas' empty reductions instead of dividing by zero
+            return np.nan, np.nan, np.nan, np.nan, rates[:0]
+        mean = total / count
+        var = total_sq / count - mean * mean
+        if var < 0.0:  # guard against rounding in the sum-of-squares form
+            var = 0.0
+        return mean, np.sqrt(var), mn, mx, rates[:count]
+
+# Bump when the computed statistics change so stale cache entries are ignored
+ANALYSIS_VERSION = 'v1'
+CACHE_DIR = '.cache'
+
+# Multiplier that converts raw timestamp units to seconds
+UNIT_SCALE = {
+    'seconds': 1.0,
+    'milliseconds': 1e-3,
+    'microseconds': 1e-6,
+    'nanoseconds': 1e-9,
+}
+
+def _cache_path(source_path):
+    """Return the cache file for a source CSV, keyed on path + mtime + version."""
+    key = hashlib.md5(
+        f'{os.path.abspath(source_path)}|{os.path.getmtime(source_path)}|{ANALYSIS_VERSION}'
+        .encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f'{key}.json')
+
+def _fast_median(values):
+    """
+    Median of a float64 ndarray via np.partition.
+
+    Selection (introselect) is O(N) versus the O(N log N) full sort that
+    pandas' nanmedian performs on a copy; for an even count the two middle
+    order statistics are selected in one partition call.
+    """
+    n = values.size
+    if n == 0:
+        return np.nan
+    k = n // 2
+    if n % 2:
+        return float(np.partition(values, k)[k])
+    part = np.partition(values, (k - 1, k))
+    return 0.5 * float(part[k - 1] + part[k])
 
 def detect_timestamp_format(timestamps):
     """
@@ -17,17 +117,20 @@ def detect_timestamp_format(timestamps):
     if not pd.api.types.is_numeric_dtype(timestamps):
         return 'unknown'
     
-    # Get a sample of non-null values to determine the typical magnitude
-    sample = timestamps.dropna().head(100)
+    # Get a sample of non-null values to determine the typical magnitude;
+    # slice first so dropna only scans 100 rows, not the whole column
+    sample = timestamps.iloc[:100].dropna()
     if len(sample) == 0:
         return 'unknown'
-    
+
     # Use the median value to get a representative timestamp
-    typical_value = sample.median()
-    
-    # Convert to string to count digits
-    typical_value_str = str(int(typical_value))
-    num_digits = len(typical_value_str)
+    typical_value = float(sample.median())
+    if typical_value <= 0:
+        return 'unknown'
+
+    # floor(log10(x)) + 1 gives the digit count without the int->str
+    # round-trip (which also overflows for ns timestamps near 2**63)
+    num_digits = int(np.floor(np.log10(typical_value))) + 1
     
     # Determine format based on the number of digits
     # These ranges are based on standard Unix timestamp lengths
@@ -42,15 +145,62 @@ def detect_timestamp_format(timestamps):
     else:
         return 'unknown'
 
-def analyze_sampling_rate(data, time_column, data_name):
+def load_csv_columns(path, usecols):
+    """
+    Load selected columns from a CSV file.
+
+    Prefers polars' lazy multithreaded CSV scan (projection pushdown means
+    only the requested columns are ever tokenized), then pyarrow's C++
+    parser, and falls back to pandas' C engine when neither is installed.
+
+    Args:
+        path: path to the CSV file
+        usecols: list of column names to load (None loads everything)
+
+    Returns:
+        pandas DataFrame with the requested columns
+    """
+    if usecols:
+        try:
+            import polars as pl
+            return pl.scan_csv(path).select(usecols).collect().to_pandas()
+        except ImportError:
+            pass
+        try:
+            import pyarrow.csv as pacsv
+            table = pacsv.read_csv(
+                path,
+                read_options=pacsv.ReadOptions(use_threads=True),
+                convert_options=pacsv.ConvertOptions(include_columns=usecols))
+            return table.to_pandas()
+        except ImportError:
+            return pd.read_csv(path, usecols=usecols, engine='c', memory_map=True)
+    return pd.read_csv(path)
+
+def analyze_sampling_rate(data, time_column, data_name, source_path=None, use_cache=True):
     """
     Analyze the sampling rate of a dataset using a time column.
-    
+
     Args:
         data: pandas DataFrame
         time_column: name of the time column to analyze
         data_name: name of the dataset for reporting
+        source_path: path of the CSV the data came from; when given (and
+            use_cache is True) the stats are cached on disk keyed on the
+            file's mtime, and an unchanged file returns the cached stats
+            without recomputing (or re-plotting) anything
+        use_cache: set False to force a full re-analysis
     """
+    cache_file = None
+    if use_cache and source_path is not None and os.path.exists(source_path):
+        cache_file = _cache_path(source_path)
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                stats = json.load(f)
+            print(f"\n=== {data_name} Sampling Rate Analysis (cached) ===")
+            print(f"Loaded cached results from {cache_file}")
+            return stats
+
     print(f"\n=== {data_name} Sampling Rate Analysis ===")
     print(f"Total samples: {len(data)}")
     
@@ -61,50 +211,98 @@ def analyze_sampling_rate(data, time_column, data_name):
         return None
     
     print(f"First 5 timestamps from '{time_column}':\n{data[time_column].head().to_string(index=False)}")
+
+    # Store model names as a categorical: integer codes plus a small
+    # categories index, so the per-period grouping below compares ints
+    # instead of hashing Python strings
+    if 'model_name' in data.columns and data['model_name'].dtype == object:
+        data['model_name'] = data['model_name'].astype('category')
     
     # Convert time column to datetime if it's not already
     if data[time_column].dtype == 'object':
         try:
-            # Try to convert to datetime
-            data[time_column] = pd.to_datetime(data[time_column])
+            # Parse each distinct string once and map back: telemetry files
+            # repeat ms-precision timestamps, so this costs O(unique) string
+            # parses instead of O(N)
+            unique_values = data[time_column].unique()
+            parsed = pd.to_datetime(unique_values, cache=True)
+            data[time_column] = data[time_column].map(dict(zip(unique_values, parsed)))
         except:
             print(f"Warning: Could not convert {time_column} to datetime format")
             return None
     
     # Detect timestamp format for numeric timestamps
     if pd.api.types.is_numeric_dtype(data[time_column]):
+        # CSV inference can yield unsigned ints, which push pandas'
+        # datetime/timedelta machinery onto a much slower Python-level path
+        # (and make differences wrap) — coerce to int64 before any arithmetic
+        if data[time_column].dtype.kind == 'u':
+            data[time_column] = data[time_column].astype(np.int64)
+
         timestamp_format = detect_timestamp_format(data[time_column])
         print(f"Detected timestamp format: {timestamp_format}")
         
-        # Convert to seconds based on detected format
-        if timestamp_format == 'seconds':
-            data['time'] = (data[time_column] - data[time_column].iloc[0])
-        elif timestamp_format == 'milliseconds':
-            data['time'] = (data[time_column] - data[time_column].iloc[0]) / 1000
-        elif timestamp_format == 'microseconds':
-            data['time'] = (data[time_column] - data[time_column].iloc[0]) / 1e6
-        elif timestamp_format == 'nanoseconds':
-            data['time'] = (data[time_column] - data[time_column].iloc[0]) / 1e9
-        else:
+        # Convert to seconds based on detected format. The normalized time
+        # stays a local ndarray — writing it back as a column would allocate
+        # a full-length Series on the caller's DataFrame and mutate it
+        raw = data[time_column].to_numpy(copy=False)
+        if raw.dtype.kind == 'f':
+            # Missing rows in a numeric CSV column parse as NaN and would
+            # propagate into every downstream statistic and axis limit
+            raw = raw[~np.isnan(raw)]
+        if timestamp_format not in UNIT_SCALE:
             print(f"Warning: Unknown timestamp format. Assuming nanoseconds as a fallback.")
-            data['time'] = (data[time_column] - data[time_column].iloc[0]) / 1e9
+        scale = UNIT_SCALE.get(timestamp_format, 1e-9)
     else:
-        # If already datetime, use total seconds from the first timestamp
-        data['time'] = (pd.to_datetime(data[time_column]) - pd.to_datetime(data[time_column].iloc[0])).dt.total_seconds()
+        # If already datetime, diff the ns-since-epoch int64 buffer directly.
+        # Normalize to ns first — the pyarrow/polars loaders can hand back
+        # datetime64[s]/[us] columns, whose raw int64 view is not nanoseconds.
+        # dropna removes NaT, whose int64 view is INT64_MIN
+        raw = (pd.to_datetime(data[time_column]).dropna()
+               .to_numpy(dtype='datetime64[ns]').view('i8'))
+        scale = 1e-9
 
-    # Calculate time differences
-    time_diffs = data['time'].diff().dropna()
-    
-    # Calculate sampling rate statistics
-    sampling_rates = 1 / time_diffs
-    avg_sampling_rate = sampling_rates.mean()
-    median_sampling_rate = sampling_rates.median()
-    std_sampling_rate = sampling_rates.std()
-    min_sampling_rate = sampling_rates.min()
-    max_sampling_rate = sampling_rates.max()
+    if raw.size:
+        times = (raw - raw[0]).astype(np.float64) * scale
+    else:
+        times = np.empty(0, np.float64)
+
+    # Calculate time differences directly on the underlying buffer;
+    # np.diff skips the NaN sentinel + copy that Series.diff().dropna() incurs
+    time_diffs = np.diff(times)
+
+    if numba is not None:
+        # JIT'd kernel fuses the diff, reciprocal, and four of the five
+        # statistics into a single memory pass (the reduction is
+        # bandwidth-bound, so fewer passes is the whole win)
+        (avg_sampling_rate, std_sampling_rate, min_sampling_rate,
+         max_sampling_rate, sampling_rates) = _sampling_rate_stats(times)
+        median_sampling_rate = _fast_median(sampling_rates)
+    else:
+        # Calculate sampling rate statistics on the raw ndarray to avoid
+        # pandas' per-operation indexing overhead (five passes over a Series).
+        # Repeated timestamps give zero diffs whose reciprocal is inf and
+        # would poison every statistic; the where= mask predicates the
+        # division in NumPy's C kernel instead of branching per element
+        valid = time_diffs > 0
+        sampling_rates = np.empty(time_diffs.size, np.float64)
+        np.divide(1.0, time_diffs, where=valid, out=sampling_rates)
+        if not valid.all():
+            sampling_rates = sampling_rates[valid]
+        if sampling_rates.size == 0:
+            # Empty ndarray reductions raise where pandas returned NaN;
+            # report NaN stats for degenerate input
+            avg_sampling_rate = median_sampling_rate = std_sampling_rate = np.nan
+            min_sampling_rate = max_sampling_rate = np.nan
+        else:
+            avg_sampling_rate = sampling_rates.mean()
+            median_sampling_rate = _fast_median(sampling_rates)
+            std_sampling_rate = sampling_rates.std()
+            min_sampling_rate = sampling_rates.min()
+            max_sampling_rate = sampling_rates.max()
     
-    # Calculate time span
-    total_duration = data['time'].max() - data['time'].min()
+    # Calculate time span (an all-NaN time column leaves times empty)
+    total_duration = times.max() - times.min() if times.size else float('nan')
     
     print(f"Time span: {total_duration:.2f} seconds")
     print(f"Average sampling rate: {avg_sampling_rate:.2f} Hz")
@@ -112,14 +310,34 @@ def analyze_sampling_rate(data, time_column, data_name):
     print(f"Standard deviation: {std_sampling_rate:.2f} Hz")
     print(f"Min sampling rate: {min_sampling_rate:.2f} Hz")
     print(f"Max sampling rate: {max_sampling_rate:.2f} Hz")
-    
+
+    stats = {
+        'avg_rate': float(avg_sampling_rate),
+        'median_rate': float(median_sampling_rate),
+        'std_rate': float(std_sampling_rate),
+        'min_rate': float(min_sampling_rate),
+        'max_rate': float(max_sampling_rate),
+        'total_duration': float(total_duration),
+        'total_samples': len(data)
+    }
+
+    # Degenerate input (a single sample, or no strictly increasing
+    # timestamps): nothing to plot and nothing worth caching
+    if sampling_rates.size == 0:
+        print(f"Warning: no positive time differences in {data_name} data; skipping plots")
+        return stats
+
     # Create visualization
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
     
-    # Plot 1: Time differences over time
-    ax1.plot(data['time'][1:], time_diffs, 'b-', alpha=0.7, linewidth=0.5)
+    # Plot 1: Time differences over time. Pass plain ndarrays so matplotlib's
+    # unit converter short-circuits, and downsample to ~50k points — drawing
+    # millions of line segments is slow and visually indistinguishable
+    plot_times = times[1:]
+    stride = max(1, len(time_diffs) // 50_000)
+    ax1.plot(plot_times[::stride], time_diffs[::stride], 'b-', alpha=0.7, linewidth=0.5)
     ax1.axhline(time_diffs.mean(), color='red', linestyle='--', label=f'Mean: {time_diffs.mean():.4f}s')
-    ax1.set_xlim(0, data['time'].max())
+    ax1.set_xlim(0, times.max())
     ax1.set_xlabel('Time (s)')
     ax1.set_ylabel('Time Difference (seconds)')
     ax1.set_title(f'{data_name}: Time Between Samples')
@@ -127,28 +345,27 @@ def analyze_sampling_rate(data, time_column, data_name):
     
     # Add vertical lines for building model periods if column exists
     if 'is_building_model' in data.columns:
-        # Find the start and end times of building periods
-        building_periods = []
-        in_building = False
-        start_time = None
-        
-        for idx, is_building in enumerate(data['is_building_model']):
-            if is_building and not in_building:
-                # Start of building period
-                start_time = data['time'].iloc[idx]
-                in_building = True
-            elif not is_building and in_building:
-                # End of building period
-                end_time = data['time'].iloc[idx-1]  # Use previous timestamp as end
-                building_periods.append((start_time, end_time))
-                in_building = False
-        
-        # Handle case where building period extends to the end
-        if in_building:
-            end_time = data['time'].iloc[-1]
-            building_periods.append((start_time, end_time))
-        
+        # Find the start and end times of building periods with vectorized
+        # edge detection instead of a Python-level row scan. Padding the mask
+        # with zeros makes np.diff emit an edge for periods that start at the
+        # first row or extend to the last one.
+        building_mask_arr = data['is_building_model'].to_numpy(dtype=np.int8)
+        edges = np.diff(np.concatenate(([0], building_mask_arr, [0])))
+        start_indices = np.flatnonzero(edges == 1)
+        end_indices = np.flatnonzero(edges == -1) - 1  # last True row of each period
+        building_periods = list(zip(times[start_indices], times[end_indices]))
+
         if building_periods:
+            # Resolve every period's model name in one pass instead of a
+            # full-length boolean mask per period (O(N*P) -> O(N)): label
+            # each row with a period id (cumulative count of start edges,
+            # zeroed outside building periods) and take the first non-null
+            # model_name per id
+            period_id = np.zeros(len(data), dtype=np.int32)
+            period_id[start_indices] = 1
+            period_id = np.cumsum(period_id) * building_mask_arr
+            model_name_by_period = data['model_name'].groupby(period_id).first()
+
             # Add vertical lines at start and end of each building period
             for i, (start_time, end_time) in enumerate(building_periods):
                 # Only add labels for the first occurrence of each type
@@ -161,29 +378,28 @@ def analyze_sampling_rate(data, time_column, data_name):
                 # Add text label in the middle of the building period
                 mid_time = (start_time + end_time) / 2
                 
-                # Find the model_name for this building period
-                building_mask = (data['time'] >= start_time) & (data['time'] <= end_time) & (data['is_building_model'] == True)
-                if building_mask.any():
-                    model_names = data.loc[building_mask, 'model_name'].dropna().unique()
-                    if len(model_names) > 0:
-                        model_name = model_names[0]  # Use the first unique model name
-                        
-                        # Get y-axis limits for text positioning
-                        y_min, y_max = ax1.get_ylim()
-                        text_y = (y_min + y_max) / 2  # Middle of y-axis
-                        
-                        # Add text label
-                        ax1.text(mid_time, text_y, model_name, 
-                                ha='center', va='center', 
-                                bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
-                                fontsize=8, rotation=90)
+                # Look up the model_name for this building period (ids are 1-based)
+                model_name = model_name_by_period.get(i + 1)
+                if model_name is not None and pd.notna(model_name):
+                    # Get y-axis limits for text positioning
+                    y_min, y_max = ax1.get_ylim()
+                    text_y = (y_min + y_max) / 2  # Middle of y-axis
+
+                    # Add text label
+                    ax1.text(mid_time, text_y, model_name,
+                            ha='center', va='center',
+                            bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.7),
+                            fontsize=8, rotation=90)
             
             print(f"Added {len(building_periods)} building periods with start/end lines and model labels")
             print(f"Building periods: {building_periods}")
     ax1.legend()
     
-    # Plot 2: Sampling rate histogram
-    ax2.hist(sampling_rates, bins=50, alpha=0.7, color='green', edgecolor='black')
+    # Plot 2: Sampling rate histogram, binned in one NumPy pass instead of
+    # matplotlib's Python-level hist wrapper (zero diffs are already masked
+    # out of sampling_rates above)
+    counts, bin_edges = np.histogram(sampling_rates, bins=50)
+    ax2.stairs(counts, bin_edges, fill=True, alpha=0.7, color='green', edgecolor='black')
     ax2.axvline(avg_sampling_rate, color='red', linestyle='--', label=f'Mean: {avg_sampling_rate:.2f} Hz')
     ax2.axvline(median_sampling_rate, color='orange', linestyle='--', label=f'Median: {median_sampling_rate:.2f} Hz')
     ax2.set_xlim(0, None)
@@ -194,17 +410,21 @@ def analyze_sampling_rate(data, time_column, data_name):
     ax2.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.show()
-    
-    return {
-        'avg_rate': avg_sampling_rate,
-        'median_rate': median_sampling_rate,
-        'std_rate': std_sampling_rate,
-        'min_rate': min_sampling_rate,
-        'max_rate': max_sampling_rate,
-        'total_duration': total_duration,
-        'total_samples': len(data)
-    }
+    if matplotlib.get_backend().lower() == 'agg':
+        figure_path = f"{data_name.lower().replace(' ', '_')}_sampling.png"
+        fig.savefig(figure_path, dpi=100)
+        print(f"Saved figure to {figure_path}")
+    else:
+        plt.show()
+    # Free the figure so memory doesn't accumulate across datasets
+    plt.close(fig)
+
+    if cache_file is not None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'w') as f:
+            json.dump(stats, f)
+
+    return stats
 
 def main():
     """Main function to analyze sampling rates of eye and body data."""
@@ -234,26 +454,39 @@ def main():
         return
     
     try:
-        # Load eye data
-        print("Loading eye data...")
-        eye_data = pd.read_csv(eye_data_path)
+        # Load both files concurrently — the CSV parsers release the GIL, so
+        # the two independent reads overlap disk I/O and parsing. Only the
+        # columns the analysis touches are parsed; telemetry CSVs are wide
+        # and skipping the rest cuts the I/O and tokenizer cost roughly
+        # linearly in the number of columns dropped.
+        print("Loading eye and body data in parallel...")
+        eye_columns = list(pd.read_csv(eye_data_path, nrows=0).columns)
+        eye_usecols = [col for col in ['gaze_capture_time', 'is_building_model', 'model_name']
+                       if col in eye_columns]
+        body_columns = list(pd.read_csv(body_data_path, nrows=0).columns)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            eye_future = executor.submit(load_csv_columns, eye_data_path, eye_usecols)
+            body_future = executor.submit(load_csv_columns, body_data_path, [body_columns[0]])
+            eye_data = eye_future.result()
+            body_data = body_future.result()
+
         print(f"Eye data loaded successfully. Shape: {eye_data.shape}")
         print(f"Eye data columns: {list(eye_data.columns)}")
-        
-        # Load body data
-        print("\nLoading body data...")
-        body_data = pd.read_csv(body_data_path)
-        print(f"Body data loaded successfully. Shape: {body_data.shape}")
-        print(f"Body data columns: {list(body_data.columns)}")
+        print(f"All columns in eye data file: {eye_columns}")
+        print(f"\nBody data loaded successfully. Shape: {body_data.shape}")
+        print(f"All columns in body data file: {body_columns}")
         
         # Analyze eye data sampling rate
         print("\nAnalyzing eye data...")
-        eye_stats = analyze_sampling_rate(eye_data, 'gaze_capture_time', 'Eye Data')
+        eye_stats = analyze_sampling_rate(eye_data, 'gaze_capture_time', 'Eye Data',
+                                          source_path=eye_data_path)
         
         # Analyze body data sampling rate (using first column)
         body_time_column = body_data.columns[0]
         print(f"\nUsing '{body_time_column}' as the time column for body data")
-        body_stats = analyze_sampling_rate(body_data, body_time_column, 'Body Data')
+        body_stats = analyze_sampling_rate(body_data, body_time_column, 'Body Data',
+                                           source_path=body_data_path)
         
         # Summary comparison
         if eye_stats and body_stats:
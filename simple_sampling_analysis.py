@@ -1,7 +1,25 @@
+import os
+import sys
+
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 
+import matplotlib
+# Use the non-interactive backend when there is no display (batch/CI runs)
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+def read_time_column(path, usecols):
+    """
+    Read selected CSV columns, using pandas' pyarrow engine (parallel C++
+    parser) when pyarrow is installed.
+    """
+    try:
+        return pd.read_csv(path, usecols=usecols, engine='pyarrow')
+    except ImportError:
+        return pd.read_csv(path, usecols=usecols, engine='c', memory_map=True)
+
 def quick_sampling_analysis(data, time_column, data_name):
     """
     Quick analysis of sampling rate for a dataset.
@@ -15,28 +33,49 @@ def quick_sampling_analysis(data, time_column, data_name):
         print(f"Available columns: {list(data.columns)}")
         return
     
-    # Convert to datetime if needed
+    # Convert to datetime if needed, parsing each distinct string only once
     if data[time_column].dtype == 'object':
         try:
-            data[time_column] = pd.to_datetime(data[time_column])
+            unique_values = data[time_column].unique()
+            parsed = pd.to_datetime(unique_values, cache=True)
+            data[time_column] = data[time_column].map(dict(zip(unique_values, parsed)))
         except:
             print(f"Warning: Could not convert {time_column} to datetime")
             return
     
-    # Calculate time differences
-    time_diffs = data[time_column].diff().dropna()
-    
-    # Convert to seconds
-    if time_diffs.dtype == 'timedelta64[ns]':
-        time_diffs_seconds = time_diffs.dt.total_seconds()
+    # Calculate time differences on the underlying buffer; np.diff skips the
+    # NaN sentinel + copy that Series.diff().dropna() incurs
+    arr = data[time_column].to_numpy(copy=False)
+    if arr.dtype.kind == 'u':
+        # Unsigned timestamps would wrap on subtraction; coerce to int64
+        arr = arr.astype(np.int64, copy=False)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        # View the ns-since-epoch int64 buffer directly instead of going
+        # through the .dt accessor; normalize to ns first since datetime64
+        # columns can carry s/us resolution
+        time_diffs_seconds = np.diff(arr.astype('datetime64[ns]', copy=False).view('i8')) * 1e-9
     else:
-        # Handle different time formats
-        time_diffs_seconds = time_diffs / 1e9 if time_diffs.max() > 1e6 else time_diffs
+        # Handle different time formats (size check first: max() raises on
+        # the empty diff array a 0/1-row input produces)
+        time_diffs = np.diff(arr)
+        time_diffs_seconds = time_diffs * 1e-9 if time_diffs.size and time_diffs.max() > 1e6 else time_diffs
     
-    # Calculate sampling rate
-    sampling_rates = 1 / time_diffs_seconds
+    # Calculate sampling rate on the raw ndarray (single NumPy pass per stat,
+    # no pandas indexing overhead). Repeated timestamps give zero diffs whose
+    # reciprocal is inf; the where= mask keeps them out of the stats without
+    # a per-element Python branch
+    valid = time_diffs_seconds > 0
+    sampling_rates = np.empty(time_diffs_seconds.size, np.float64)
+    np.divide(1.0, time_diffs_seconds, where=valid, out=sampling_rates)
+    if not valid.all():
+        sampling_rates = sampling_rates[valid]
+    if sampling_rates.size == 0:
+        # Single sample or identical timestamps — empty ndarray reductions
+        # raise, and there is nothing meaningful to report anyway
+        print(f"Warning: no positive time differences in {data_name} data!")
+        return None
     avg_rate = sampling_rates.mean()
-    
+
     print(f"Average sampling rate: {avg_rate:.2f} Hz")
     print(f"Min sampling rate: {sampling_rates.min():.2f} Hz")
     print(f"Max sampling rate: {sampling_rates.max():.2f} Hz")
@@ -45,7 +84,7 @@ def quick_sampling_analysis(data, time_column, data_name):
     # Plot
     plt.figure(figsize=(10, 6))
     plt.subplot(2, 1, 1)
-    plt.plot(time_diffs_seconds.index, time_diffs_seconds, 'b-', alpha=0.7)
+    plt.plot(np.arange(1, len(time_diffs_seconds) + 1), time_diffs_seconds, 'b-', alpha=0.7)
     plt.axhline(time_diffs_seconds.mean(), color='red', linestyle='--', 
                 label=f'Mean: {time_diffs_seconds.mean():.4f}s')
     plt.xlabel('Sample Index')
@@ -55,7 +94,8 @@ def quick_sampling_analysis(data, time_column, data_name):
     plt.grid(True, alpha=0.3)
     
     plt.subplot(2, 1, 2)
-    plt.hist(sampling_rates, bins=30, alpha=0.7, color='green')
+    counts, bin_edges = np.histogram(sampling_rates, bins=30)
+    plt.stairs(counts, bin_edges, fill=True, alpha=0.7, color='green')
     plt.axvline(avg_rate, color='red', linestyle='--', label=f'Mean: {avg_rate:.2f} Hz')
     plt.xlabel('Sampling Rate (Hz)')
     plt.ylabel('Frequency')
@@ -64,8 +104,12 @@ def quick_sampling_analysis(data, time_column, data_name):
     plt.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.show()
-    
+    if matplotlib.get_backend().lower() == 'agg':
+        plt.savefig(f"{data_name.lower().replace(' ', '_')}_sampling.png", dpi=100)
+    else:
+        plt.show()
+    plt.close()
+
     return avg_rate
 
 # Example usage with the data files
@@ -74,13 +118,16 @@ if __name__ == "__main__":
         # Load data
         print("Loading data files...")
         
-        # Eye data
-        eye_data = pd.read_csv("D:/LegoVR/unity-lego-vr/Other_than_in_project_files/ET_Data/P001_ET_Data_2025-07-31.csv")
+        # Eye data (only the time column is used, so skip the rest of the
+        # wide telemetry CSV)
+        eye_data_path = "D:/LegoVR/unity-lego-vr/Other_than_in_project_files/ET_Data/P001_ET_Data_2025-07-31.csv"
+        eye_data = read_time_column(eye_data_path, ['gaze_capture_time'])
         eye_rate = quick_sampling_analysis(eye_data, 'gaze_capture_time', 'Eye Data')
-        
-        # Body data
-        body_data = pd.read_csv("D:/LegoVR/unity-lego-vr/Other_than_in_project_files/BT_Data/test_BT_Data_2025-07-31.csv")
-        body_time_col = body_data.columns[0]  # First column
+
+        # Body data (first column is the time column)
+        body_data_path = "D:/LegoVR/unity-lego-vr/Other_than_in_project_files/BT_Data/test_BT_Data_2025-07-31.csv"
+        body_time_col = pd.read_csv(body_data_path, nrows=0).columns[0]
+        body_data = read_time_column(body_data_path, [body_time_col])
         body_rate = quick_sampling_analysis(body_data, body_time_col, 'Body Data')
         
         # Comparison